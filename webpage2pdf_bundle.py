@@ -1,19 +1,35 @@
 import os
 import sys
+import gc
 import csv
+import io
+import errno
+import re
+import html
+import json
 import time
+import codecs
+import asyncio
+import shutil
+import hashlib
+import itertools
+import collections
 import threading
 import subprocess
+import multiprocessing
+import concurrent.futures.process
 import logging
+import tempfile
 import traceback
-import concurrent.futures
+import importlib.util
 from urllib.parse import urlparse
 from datetime import datetime
 
 # Attempt to import required modules; bootstrap will handle if not present.
 try:
-    import pdfkit
-    from PyPDF2 import PdfMerger
+    import requests
+    from requests.adapters import HTTPAdapter
+    from pypdf import PdfReader, PdfWriter
     import tkinter as tk
     from tkinter import filedialog, messagebox, ttk
 except ImportError:
@@ -30,6 +46,10 @@ def bootstrap_venv():
     if sys.prefix != sys.base_prefix:
         return  # Already in a venv
 
+    deps = ["pypdf", "requests"]
+    if all(importlib.util.find_spec(dep) is not None for dep in deps):
+        return  # Dependencies already importable here; no venv needed
+
     venv_path = os.path.join(os.getcwd(), "venv")
     if not os.path.exists(venv_path):
         print("Creating virtual environment...")
@@ -44,11 +64,22 @@ def bootstrap_venv():
         pip_executable = os.path.join(venv_path, "bin", "pip")
         python_executable = os.path.join(venv_path, "bin", "python")
 
-    # Install required dependencies.
-    deps = ["pdfkit", "PyPDF2"]
-    print("Installing dependencies...")
-    subprocess.check_call([pip_executable, "install"] + deps)
-    print("Dependencies installed.")
+    # Install required dependencies, unless a previous run already installed
+    # this exact dependency list (recorded in a sentinel file).
+    deps_hash = hashlib.sha256("\n".join(deps).encode("utf-8")).hexdigest()
+    sentinel_path = os.path.join(venv_path, ".deps_ok")
+    try:
+        with open(sentinel_path, encoding="utf-8") as f:
+            deps_ok = f.read().strip() == deps_hash
+    except OSError:
+        deps_ok = False
+    if not deps_ok:
+        print("Installing dependencies...")
+        subprocess.check_call([pip_executable, "install", "--disable-pip-version-check",
+                               "--no-input", "--quiet"] + deps)
+        with open(sentinel_path, "w", encoding="utf-8") as f:
+            f.write(deps_hash)
+        print("Dependencies installed.")
 
     # Relaunch the script in the virtual environment.
     print("Relaunching script in virtual environment...")
@@ -69,6 +100,541 @@ logging.basicConfig(
 # Global cancel flag.
 cancel_event = threading.Event()
 
+# Number of URLs handed to a single wkhtmltopdf invocation in merged mode.
+BATCH_SIZE = 8
+
+# Number of PDFs merged between explicit garbage collections.
+MERGE_GC_INTERVAL = 8
+
+# Buffer size used when writing the merged PDF.
+WRITE_BUFFER_SIZE = 8 * 1024 * 1024
+
+# Buffer size used when reading the URL CSV.
+READ_BUFFER_SIZE = 1024 * 1024
+
+# Most O_TMPFILE batch files held open at once. Each one costs a file
+# descriptor until the merge is done; later batches use named files instead.
+MAX_ANONYMOUS_FILES = 256
+
+# Lines kept in the on-screen log; older lines remain in conversion.log.
+LOG_MAX_LINES = 2000
+
+# Seconds a worker may spend per URL before it is killed and the job fails.
+URL_TIMEOUT = 120
+
+# Seconds to wait after "Done" for the "Exit with code" line wkhtmltopdf
+# prints when a page had load errors, just before the worker exits.
+EXIT_STATUS_GRACE = 0.1
+
+# wkhtmltopdf reads each --read-args-from-stdin line into a fixed buffer of
+# about 20 KB; longer job lines would be split into bogus arguments.
+STDIN_LINE_LIMIT = 20000
+
+# Milliseconds between checks for callbacks queued by the event loop and
+# merge threads.
+CALL_POLL_INTERVAL = 50
+
+# Milliseconds between writes of buffered log lines to the on-screen log.
+LOG_FLUSH_INTERVAL = 200
+
+def build_wk_argv(wk_path, options):
+    """
+    Build the wkhtmltopdf command line (without inputs and output) from an
+    options dict. Options whose value is None are passed as bare flags. The
+    result is a tuple so one copy can be shared by every worker unchanged.
+    """
+    argv = [wk_path]
+    for key, value in options.items():
+        argv.append(f"--{key}")
+        if value is not None:
+            argv.append(str(value))
+    return tuple(argv)
+
+def iter_urls(csv_file, col_index, skip_header=False):
+    """
+    Yield the URL in column col_index of each CSV row, reading the file
+    lazily. Rows too short to have that column, or with a blank cell there,
+    are skipped.
+    """
+    with open(csv_file, "rb", buffering=READ_BUFFER_SIZE) as raw, \
+            io.TextIOWrapper(raw, encoding="utf-8", newline="") as f:
+        reader = csv.reader(f)
+        if skip_header:
+            next(reader, None)
+        for row in reader:
+            if len(row) > col_index:
+                url = row[col_index].strip()
+                if url:
+                    yield url
+
+def is_web_url(url):
+    """Return True if url is an http(s) URL wkhtmltopdf can fetch."""
+    try:
+        return urlparse(url).scheme in ("http", "https")
+    except ValueError:
+        return False
+
+def url_host(url):
+    """
+    Return the network location of an http(s) URL without a leading "www.",
+    or "" if it has none. Plain string slicing, cheaper than urlparse.
+    """
+    host = url.partition("://")[2]
+    for sep in "/?#":
+        host = host.partition(sep)[0]
+    return host[4:] if host.startswith("www.") else host
+
+def stdin_safe_url(url):
+    """
+    Percent-encode the characters wkhtmltopdf's --read-args-from-stdin parser
+    treats specially (whitespace, quotes and backslashes), along with control
+    characters, so url stays a single argument on a single line.
+    """
+    return re.sub(r"[\s'\"\\\x00-\x1f\x7f]",
+                  lambda m: "".join(f"%{b:02X}" for b in m.group(0).encode("utf-8")), url)
+
+def iter_batches(items, size):
+    """Yield lists of up to size consecutive items from an iterable."""
+    it = iter(items)
+    batch = list(itertools.islice(it, size))
+    while batch:
+        yield batch
+        batch = list(itertools.islice(it, size))
+
+def open_anonymous_file(folder):
+    """
+    Create an unnamed file in folder with O_TMPFILE (Linux only) and return
+    (fd, path), where path is a /proc link other processes can open. The file
+    has no directory entry and disappears once fd is closed, even if the app
+    crashes. Returns None where O_TMPFILE is unavailable; other errors, such
+    as running out of descriptors, are raised.
+    """
+    if not hasattr(os, "O_TMPFILE"):
+        return None
+    try:
+        fd = os.open(folder, os.O_TMPFILE | os.O_RDWR, 0o600)
+    except OSError as e:
+        if e.errno in (errno.EOPNOTSUPP, errno.EISDIR, errno.EINVAL):
+            return None  # Kernel or filesystem without O_TMPFILE support
+        raise
+    return fd, f"/proc/{os.getpid()}/fd/{fd}"
+
+def prefetch_html(session, url, work_dir, name):
+    """
+    Download url over a shared requests session and save it as work_dir/name
+    with a <base> tag, so relative links still resolve against the site.
+    Returns the file name to hand to wkhtmltopdf, or the URL itself when the
+    response is not HTML.
+    """
+    # Streamed, so a non-HTML body is never downloaded here as well as by
+    # wkhtmltopdf.
+    with session.get(url, timeout=30, stream=True) as response:
+        response.raise_for_status()
+        content_type = response.headers.get("Content-Type", "")
+        if "html" not in content_type.lower():
+            return url
+        content = response.content
+    head_tags = b""
+    # The first <base> in a document wins; keep the page's own if it has one.
+    if not re.search(rb"<base[\s>]", content, re.IGNORECASE):
+        head_tags = f'<base href="{html.escape(response.url, quote=True)}">'.encode("utf-8")
+    # A charset given only in the Content-Type header is lost once the page is
+    # a local file, so carry it over into a <meta> tag.
+    charset = re.search(r"charset=[\"']?([\w.:-]+)", content_type, re.IGNORECASE)
+    if charset and not re.search(rb"<meta[^>]+charset", content, re.IGNORECASE):
+        head_tags = f'<meta charset="{charset.group(1)}">'.encode("ascii") + head_tags
+    if head_tags:
+        # Insert inside <head>, or failing that after <html> or the doctype;
+        # anything ahead of the doctype would switch the page to quirks mode.
+        for pattern in (rb"<head(\s[^>]*)?>", rb"<html(\s[^>]*)?>", rb"<!doctype[^>]*>"):
+            content, found = re.subn(pattern, lambda m: m.group(0) + head_tags,
+                                     content, count=1, flags=re.IGNORECASE)
+            if found:
+                break
+        else:
+            content = head_tags + content
+    with open(os.path.join(work_dir, name), "wb") as f:
+        f.write(content)
+    return name
+
+# =============================================================================
+# PDF Merging
+# =============================================================================
+def merge_pdfs_pypdf(paths, output_pdf, discard=False):
+    """
+    Concatenate the PDFs at paths into output_pdf with pypdf. Each reader is
+    dropped once its pages are copied, so peak memory stays near the size of
+    one input rather than all of them. With discard, each input file is also
+    deleted as soon as it has been read.
+    """
+    with PdfWriter() as writer:
+        for merged, pdf_path in enumerate(paths, start=1):
+            # wkhtmltopdf output is well-formed; skip pypdf's strict checks.
+            reader = PdfReader(pdf_path, strict=False)
+            for page in reader.pages:
+                writer.add_page(page)
+            del reader
+            if discard:
+                try:
+                    os.remove(pdf_path)
+                except OSError:
+                    # Anonymous batch files have no name to remove; they go
+                    # away when their descriptor is closed.
+                    pass
+            if merged % MERGE_GC_INTERVAL == 0:
+                gc.collect()
+        # Every batch PDF embeds its own copy of the same fonts; keep one
+        # (pypdf 4.3+).
+        if hasattr(writer, "compress_identical_objects"):
+            writer.compress_identical_objects()
+        with open(output_pdf, "wb", buffering=WRITE_BUFFER_SIZE) as f:
+            writer.write(f)
+
+def merge_pdfs_qpdf(qpdf_path, paths, output_pdf):
+    """
+    Concatenate the PDFs at paths into output_pdf with qpdf, which copies page
+    objects without re-parsing their content streams.
+    """
+    result = subprocess.run([qpdf_path, "--empty", "--pages"] + list(paths) + ["--", output_pdf],
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    # Exit code 3 means qpdf succeeded but printed warnings.
+    if result.returncode not in (0, 3):
+        stderr = result.stderr.decode("utf-8", errors="replace").strip()
+        raise IOError(f"qpdf exited with code {result.returncode}: {stderr}")
+
+def merge_pdfs(paths, output_pdf, qpdf_path=None):
+    """
+    Merge paths into output_pdf with qpdf when qpdf_path is given, otherwise
+    with pypdf. Runs in the merge process, so it must stay at module level.
+    """
+    if qpdf_path:
+        merge_pdfs_qpdf(qpdf_path, paths, output_pdf)
+    else:
+        merge_pdfs_pypdf(paths, output_pdf, discard=True)
+
+# =============================================================================
+# Event Loop & Persistent wkhtmltopdf Workers
+# =============================================================================
+class EventLoopThread:
+    """
+    An asyncio event loop running in a background daemon thread, so the Tk
+    main loop stays responsive while conversions are in flight.
+    """
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+
+    def submit(self, coro):
+        """Schedule coro on the loop and return a concurrent.futures.Future for it."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+class WkWorker:
+    """
+    A long-running wkhtmltopdf process started with --read-args-from-stdin.
+    Every line written to its stdin is one conversion, so Qt/WebKit start-up
+    is paid once per worker instead of once per job.
+
+    wkhtmltopdf splits stdin lines on whitespace, so an output path that
+    contains whitespace, quotes or backslashes is never put on the line: the
+    worker renders to a fixed file name inside its working directory and
+    moves the result into place afterwards.
+    """
+    def __init__(self, process, work_dir, worker_id):
+        self.process = process
+        self.work_dir = work_dir
+        self.output_name = f"worker_{worker_id}.pdf"
+        self.decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self.stderr_buffer = ""
+        # Set once stderr hits EOF, which can be before returncode is filled in.
+        self.exited = False
+        # Set when a job failed on output left over from the previous job.
+        self.stale = False
+        self.last_urls = []
+
+    @classmethod
+    async def start(cls, argv, work_dir, worker_id):
+        """Start a worker from argv, which must already end in --read-args-from-stdin."""
+        process = await asyncio.create_subprocess_exec(
+            *argv, cwd=work_dir,
+            stdin=asyncio.subprocess.PIPE, stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.PIPE)
+        return cls(process, work_dir, worker_id)
+
+    def alive(self):
+        return not self.exited and self.process.returncode is None
+
+    async def read_line(self):
+        """
+        Return the next stderr line, treating the carriage returns of the
+        progress bar as line breaks, or None once the process has exited.
+        """
+        while True:
+            match = re.search(r"[\r\n]", self.stderr_buffer)
+            if match:
+                line = self.stderr_buffer[:match.start()]
+                self.stderr_buffer = self.stderr_buffer[match.end():]
+                return line.strip()
+            chunk = await self.process.stderr.read(4096)
+            if not chunk:
+                self.exited = True
+                return None
+            self.stderr_buffer += self.decoder.decode(chunk)
+
+    async def convert(self, urls, output_path):
+        """
+        Render urls into output_path. wkhtmltopdf prints "Done" on stderr after
+        each successful conversion and exits when one fails.
+        """
+        inputs = [stdin_safe_url(url) for url in urls]
+        direct = os.path.isabs(output_path) and not re.search(r"[\s\\\"'\x00-\x1f\x7f]", output_path)
+        target = output_path if direct else self.output_name
+        line = (" ".join(inputs + [target]) + "\n").encode("utf-8")
+        if len(line) > STDIN_LINE_LIMIT:
+            raise IOError(f"Job is too long for wkhtmltopdf ({len(line)} bytes, limit {STDIN_LINE_LIMIT})")
+        errors = []
+        try:
+            self.process.stdin.write(line)
+            await self.process.stdin.drain()
+        except (OSError, RuntimeError) as e:
+            self.exited = True
+            raise IOError(f"wkhtmltopdf worker is not running: {e}")
+        timeout = URL_TIMEOUT * len(urls)
+        try:
+            await asyncio.wait_for(self.wait_done(errors), timeout)
+        except asyncio.TimeoutError:
+            # A hung page would otherwise hold this worker forever.
+            self.exited = True
+            self.kill()
+            raise IOError(f"wkhtmltopdf timed out after {timeout} seconds")
+        await self.check_exit_status(errors)
+        self.last_urls = urls
+        for warning in errors:
+            logging.warning(f"{', '.join(urls)}: {warning}")
+        if not direct:
+            os.replace(os.path.join(self.work_dir, self.output_name), output_path)
+
+    async def wait_done(self, errors):
+        """
+        Wait for the "Done" line of the current job, collecting error and
+        warning lines into errors.
+        """
+        started = False
+        while True:
+            line = await self.read_line()
+            if line is None:
+                # Exiting before this job printed anything means the previous
+                # job failed after its "Done".
+                self.stale = not started
+                raise IOError(" ".join(errors) or "wkhtmltopdf worker exited unexpectedly")
+            if line == "Done":
+                return
+            if not started and line.startswith("Exit with code"):
+                self.stale = True
+                raise IOError(f"Worker exited after its previous job: {line}")
+            if line.startswith(("Error", "Warning", "Exit with code")):
+                errors.append(line)
+            if line:
+                started = True
+
+    async def check_exit_status(self, errors):
+        """
+        After "Done", a page with load errors is followed by an "Exit with
+        code" line and the worker exits. Wait briefly for that, so the job is
+        reported as failed and the dying worker is not reused.
+        """
+        while True:
+            try:
+                line = await asyncio.wait_for(self.read_line(), EXIT_STATUS_GRACE)
+            except asyncio.TimeoutError:
+                return  # Nothing more; the worker is ready for another job
+            if line is None:
+                raise IOError(" ".join(errors) or "wkhtmltopdf worker exited after converting")
+            if line.startswith(("Error", "Warning", "Exit with code")):
+                errors.append(line)
+            if line.startswith("Exit with code"):
+                self.exited = True
+                raise IOError(" ".join(errors))
+
+    def kill(self):
+        try:
+            self.process.kill()
+        except ProcessLookupError:
+            pass  # Already exited
+
+    async def close(self, kill=False):
+        if kill:
+            self.kill()
+        elif self.alive():
+            self.process.stdin.close()
+        try:
+            await asyncio.wait_for(self.process.wait(), timeout=5)
+        except asyncio.TimeoutError:
+            self.kill()
+
+class WkWorkerPool:
+    """
+    Runs conversions on WkWorker processes, reusing idle workers and starting
+    a new one only when none is free. Jobs hold one of size slots while they
+    run, which caps the pool at size processes. Must be used from the event
+    loop thread.
+    """
+    def __init__(self, wk_argv, work_dir, size):
+        self.wk_argv = wk_argv
+        # The worker command line, built once per run. On POSIX it is
+        # pre-encoded, so subprocess does not re-encode it on every start.
+        self.worker_argv = wk_argv + ("--read-args-from-stdin",)
+        if os.name == "posix":
+            self.worker_argv = tuple(os.fsencode(arg) for arg in self.worker_argv)
+        self.work_dir = work_dir
+        self.size = size
+        self.slots = None
+        self.idle = []
+        self.workers = []
+        # Ids are taken before the start is awaited, so workers started
+        # concurrently never share a scratch file name.
+        self.worker_ids = itertools.count(1)
+        self.closed = False
+        self.closing = None
+
+    def slot(self):
+        """Return the semaphore a job must hold while it uses the pool."""
+        # Created on first use so it belongs to the running loop.
+        if self.slots is None:
+            self.slots = asyncio.Semaphore(self.size)
+        return self.slots
+
+    async def convert(self, urls, output_path):
+        if self.closed:
+            raise IOError("Worker pool has been shut down.")
+        if self.idle:
+            worker = self.idle.pop()
+        else:
+            worker = await WkWorker.start(self.worker_argv, self.work_dir, next(self.worker_ids))
+            self.workers.append(worker)
+            if self.closed:
+                await worker.close(kill=True)
+                raise IOError("Worker pool has been shut down.")
+        try:
+            try:
+                await worker.convert(urls, output_path)
+            except IOError:
+                if not worker.stale or self.closed:
+                    raise
+                # The failure belonged to the worker's previous job, which was
+                # already reported as converted; this job never ran, so give
+                # it a fresh worker.
+                logging.warning(f"{', '.join(worker.last_urls)}: wkhtmltopdf reported an error "
+                                f"after finishing this page")
+                worker.kill()
+                worker = await WkWorker.start(self.worker_argv, self.work_dir, next(self.worker_ids))
+                self.workers.append(worker)
+                if self.closed:
+                    await worker.close(kill=True)
+                    raise IOError("Worker pool has been shut down.")
+                await worker.convert(urls, output_path)
+        finally:
+            if worker.alive() and not self.closed:
+                self.idle.append(worker)
+
+    async def close(self, kill=False):
+        """Stop every worker process and remove the working directory."""
+        self.closed = True
+        if self.closing is None:
+            self.closing = asyncio.ensure_future(self._shutdown(kill))
+        elif kill:
+            for worker in self.workers:
+                worker.kill()
+        await self.closing
+
+    async def _shutdown(self, kill):
+        await asyncio.gather(*(worker.close(kill) for worker in self.workers))
+        shutil.rmtree(self.work_dir, ignore_errors=True)
+
+# =============================================================================
+# Rendered PDF Cache
+# =============================================================================
+class PdfCache:
+    """
+    Disk cache of rendered PDFs. Entries are keyed on the wkhtmltopdf options
+    and the URL(s) of a job, and are reused only while every URL still answers
+    with the same ETag/Last-Modified validators (or a 304 Not Modified).
+    """
+    def __init__(self, folder):
+        self.folder = folder
+        self.index_path = os.path.join(folder, "index.json")
+        self.lock = threading.Lock()
+        os.makedirs(folder, exist_ok=True)
+        try:
+            with open(self.index_path, encoding="utf-8") as f:
+                self.index = json.load(f)
+        except (OSError, ValueError):
+            self.index = {}
+
+    def key(self, wk_argv, urls):
+        # The executable path is left out so moving wkhtmltopdf keeps the cache valid.
+        return hashlib.sha256("\n".join(itertools.chain(wk_argv[1:], urls)).encode("utf-8")).hexdigest()
+
+    def pdf_path(self, key):
+        return os.path.join(self.folder, f"{key}.pdf")
+
+    def probe(self, url, known):
+        """
+        Return (unchanged, validators) for a URL. validators is None when the
+        server offers neither an ETag nor a Last-Modified header.
+        """
+        headers = {}
+        if known.get("etag"):
+            headers["If-None-Match"] = known["etag"]
+        if known.get("last_modified"):
+            headers["If-Modified-Since"] = known["last_modified"]
+        try:
+            response = requests.head(url, headers=headers, allow_redirects=True, timeout=15)
+        except requests.RequestException:
+            logging.exception(f"Error probing URL {url}")
+            return False, None
+        if response.status_code == 304:
+            return True, known
+        if response.status_code != 200:
+            return False, None
+        validators = {
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+        }
+        if not validators["etag"] and not validators["last_modified"]:
+            return False, None
+        return validators == known, validators
+
+    def fetch(self, key, urls, output_path):
+        """
+        Copy the cached PDF for key to output_path if none of its URLs changed.
+        Returns (hit, validators); validators is None when the job can't be cached.
+        """
+        with self.lock:
+            entry = self.index.get(key, {})
+        validators = {}
+        unchanged = bool(entry)
+        for url in urls:
+            url_unchanged, url_validators = self.probe(url, entry.get(url, {}))
+            if url_validators is None:
+                return False, None
+            validators[url] = url_validators
+            unchanged = unchanged and url_unchanged
+        if unchanged and os.path.exists(self.pdf_path(key)):
+            shutil.copyfile(self.pdf_path(key), output_path)
+            return True, validators
+        return False, validators
+
+    def store(self, key, validators, output_path):
+        shutil.copyfile(output_path, self.pdf_path(key))
+        with self.lock:
+            self.index[key] = validators
+
+    def save(self):
+        with self.lock:
+            with open(self.index_path, "w", encoding="utf-8") as f:
+                json.dump(self.index, f)
+
 # =============================================================================
 # Simple Tooltip Class for Tkinter Widgets
 # =============================================================================
@@ -126,7 +692,21 @@ class WebPage2PDFBundle:
         self.root.title("WebPage2PDF Bundle")
         self.start_time = None
         self.advanced_visible = tk.BooleanVar(value=True)
+        # Log lines waiting to be written to the text box by flush_log.
+        self.log_buffer = collections.deque()
+        self.log_flush_pending = False
+        self.worker_pool = None
+        self.event_loop = EventLoopThread()
+        # wkhtmltopdf version strings keyed by executable path; cleared whenever
+        # the path entry is edited.
+        self.wk_version_cache = {}
+        # Single-process pool for merging, started on the first merge.
+        self.merge_executor = None
+        # Callbacks queued by other threads, run on the Tk thread by
+        # run_pending_calls; Tk itself is never called off the Tk thread.
+        self.pending_calls = collections.deque()
         self.setup_gui()
+        self.root.after(CALL_POLL_INTERVAL, self.run_pending_calls)
 
     def setup_gui(self):
         # --------------------
@@ -158,7 +738,9 @@ class WebPage2PDFBundle:
         # --------------------
         # Row 2: wkhtmltopdf Path
         tk.Label(self.root, text="wkhtmltopdf Path:").grid(row=2, column=0, sticky="e", padx=5, pady=5)
-        self.wk_entry = tk.Entry(self.root, width=50)
+        self.wk_path_var = tk.StringVar()
+        self.wk_path_var.trace_add("write", lambda *args: self.wk_version_cache.clear())
+        self.wk_entry = tk.Entry(self.root, width=50, textvariable=self.wk_path_var)
         self.wk_entry.grid(row=2, column=1, padx=5, pady=5)
         default_path = r"C:\Program Files\wkhtmltopdf\bin\wkhtmltopdf.exe" if os.name == "nt" else "/usr/local/bin/wkhtmltopdf"
         self.wk_entry.insert(0, default_path)
@@ -243,11 +825,53 @@ class WebPage2PDFBundle:
         self.margin_right_entry.insert(0, "10")
         # Concurrency: Max Workers
         tk.Label(self.advanced_frame, text="Max Workers:").grid(row=3, column=0, padx=5, pady=5, sticky="e")
-        self.max_workers_spin = tk.Spinbox(self.advanced_frame, from_=1, to=16, width=5)
+        # Workers spend much of their time waiting on the network, so the
+        # default oversubscribes the CPU cores (the usual I/O-bound heuristic).
+        self.max_workers_spin = tk.Spinbox(self.advanced_frame, from_=1, to=64, width=5)
         self.max_workers_spin.grid(row=3, column=1, padx=5, pady=5, sticky="w")
         self.max_workers_spin.delete(0, tk.END)
-        self.max_workers_spin.insert(0, "3")
+        self.max_workers_spin.insert(0, str(min(32, (os.cpu_count() or 4) * 4)))
         tk.Label(self.advanced_frame, text="(More workers = faster but more CPU intensive)").grid(row=3, column=2, columnspan=2, padx=5, pady=5, sticky="w")
+        # Cache of rendered PDFs
+        self.use_cache_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(self.advanced_frame, text="Reuse cached PDFs for unchanged pages",
+                       variable=self.use_cache_var).grid(row=4, column=0, columnspan=2, padx=5, pady=5, sticky="w")
+        cache_help = tk.Label(self.advanced_frame, text="?", fg="blue", cursor="question_arrow")
+        cache_help.grid(row=4, column=2, padx=5, pady=5, sticky="w")
+        ToolTip(cache_help, "Keeps rendered PDFs in a 'cache' folder and checks each URL's ETag/Last-Modified headers "
+                            "before rendering. Pages the server reports as unchanged are copied from the cache.")
+        # Merge backend
+        self.fast_merge_var = tk.BooleanVar(value=True)
+        tk.Checkbutton(self.advanced_frame, text="Fast merge (qpdf)",
+                       variable=self.fast_merge_var).grid(row=5, column=0, columnspan=2, padx=5, pady=5, sticky="w")
+        merge_help = tk.Label(self.advanced_frame, text="?", fg="blue", cursor="question_arrow")
+        merge_help.grid(row=5, column=2, padx=5, pady=5, sticky="w")
+        ToolTip(merge_help, "Uses qpdf to merge PDFs when it is installed and on your PATH; "
+                            "otherwise the built-in merger is used.")
+        # Speed vs. fidelity flags
+        self.disable_js_var = tk.BooleanVar(value=False)
+        self.no_images_var = tk.BooleanVar(value=False)
+        self.low_quality_var = tk.BooleanVar(value=False)
+        self.ignore_load_errors_var = tk.BooleanVar(value=False)
+        speed_frame = tk.Frame(self.advanced_frame)
+        speed_frame.grid(row=6, column=0, columnspan=4, padx=5, pady=5, sticky="w")
+        tk.Checkbutton(speed_frame, text="Disable JavaScript", variable=self.disable_js_var).pack(side=tk.LEFT)
+        tk.Checkbutton(speed_frame, text="Disable images", variable=self.no_images_var).pack(side=tk.LEFT, padx=5)
+        tk.Checkbutton(speed_frame, text="Low quality", variable=self.low_quality_var).pack(side=tk.LEFT, padx=5)
+        tk.Checkbutton(speed_frame, text="Ignore load errors", variable=self.ignore_load_errors_var).pack(side=tk.LEFT, padx=5)
+        speed_help = tk.Label(speed_frame, text="?", fg="blue", cursor="question_arrow")
+        speed_help.pack(side=tk.LEFT, padx=5)
+        ToolTip(speed_help, "Trade fidelity for speed. Script-heavy pages render much faster without JavaScript; "
+                            "ignoring load errors keeps a page whose images or scripts fail to load.")
+        # Prefetch HTML over shared connections
+        self.prefetch_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(self.advanced_frame, text="Prefetch HTML over shared connections",
+                       variable=self.prefetch_var).grid(row=7, column=0, columnspan=2, padx=5, pady=5, sticky="w")
+        prefetch_help = tk.Label(self.advanced_frame, text="?", fg="blue", cursor="question_arrow")
+        prefetch_help.grid(row=7, column=2, padx=5, pady=5, sticky="w")
+        ToolTip(prefetch_help, "Downloads each page's HTML with one pooled HTTP session (keep-alive) instead of a new "
+                               "connection per page. Best for static pages; leave off for sites that build their "
+                               "content with JavaScript.")
 
         # --------------------
         # Row 8: Progress Bar & ETA
@@ -336,14 +960,48 @@ class WebPage2PDFBundle:
             self.output_pdf_browse_button.grid_remove()
             self.show_separate_mode_widgets()
 
+    # --------------------
+    # Cross-Thread Callbacks
+    def call_soon(self, func, *args):
+        """Queue func(*args) to run on the Tk thread. Safe from any thread."""
+        self.pending_calls.append((func, args))
+
+    def run_pending_calls(self):
+        try:
+            while self.pending_calls:
+                func, args = self.pending_calls.popleft()
+                func(*args)
+        finally:
+            self.root.after(CALL_POLL_INTERVAL, self.run_pending_calls)
+
     # --------------------
     # Logging Helpers
+    # Messages are buffered and written to the text box at most once every
+    # LOG_FLUSH_INTERVAL ms, so a burst of log lines costs one widget update
+    # instead of one per line.
     def log(self, message):
+        self.log_buffer.append(message + "\n")
+        logging.info(message)
+        if not self.log_flush_pending:
+            self.log_flush_pending = True
+            self.root.after(LOG_FLUSH_INTERVAL, self.flush_log)
+
+    def flush_log(self):
+        self.log_flush_pending = False
+        batch = []
+        while self.log_buffer:
+            batch.append(self.log_buffer.popleft())
+        if not batch:
+            return
+        # Lines beyond what the widget keeps would be trimmed straight away.
+        del batch[:-LOG_MAX_LINES]
         self.text_box.config(state=tk.NORMAL)
-        self.text_box.insert(tk.END, message + "\n")
+        self.text_box.insert(tk.END, "".join(batch))
+        lines = int(self.text_box.index("end-1c").split(".")[0])
+        if lines > LOG_MAX_LINES:
+            self.text_box.delete("1.0", f"{lines - LOG_MAX_LINES}.0")
         self.text_box.config(state=tk.DISABLED)
         self.text_box.see(tk.END)
-        logging.info(message)
 
     def log_exception(self, message):
         self.log(message)
@@ -362,23 +1020,76 @@ class WebPage2PDFBundle:
         self.eta_label.config(text=f"Estimated Time Remaining: {eta}")
 
     # --------------------
-    # Worker function to process a single URL.
-    def process_url(self, url, index, config, options, output_path):
-        if cancel_event.is_set():
-            return None
-        try:
-            pdfkit.from_url(url, output_path, configuration=config, options=options)
-            return (index, output_path, None)
-        except Exception as e:
-            logging.exception(f"Error processing URL {url}")
-            return (index, output_path, str(e))
+    # wkhtmltopdf Version Probe (cached per executable path)
+    def wkhtmltopdf_version(self, wk_path):
+        if wk_path not in self.wk_version_cache:
+            result = subprocess.run([wk_path, "-V"], stdout=subprocess.PIPE,
+                                    stderr=subprocess.DEVNULL, timeout=15)
+            version = result.stdout.decode("utf-8", errors="replace").strip()
+            if result.returncode != 0 or "wkhtmltopdf" not in version:
+                raise IOError(f"{wk_path} does not look like a wkhtmltopdf executable.")
+            self.wk_version_cache[wk_path] = version
+        return self.wk_version_cache[wk_path]
 
     # --------------------
-    # Start Conversion (runs in a separate thread)
+    # Coroutine to render a list of URLs (a single URL in separate mode) into
+    # one PDF with a single conversion on a persistent wkhtmltopdf worker.
+    # Blocking HTTP and file work runs in the loop's default executor.
+    async def process_url(self, urls, index, pool, output_path, cache=None, session=None):
+        async with pool.slot():
+            if cancel_event.is_set():
+                return None
+            loop = asyncio.get_running_loop()
+            prefetched = []
+            try:
+                validators = None
+                if cache is not None:
+                    key = cache.key(pool.wk_argv, urls)
+                    hit, validators = await loop.run_in_executor(None, cache.fetch, key, urls, output_path)
+                    if hit:
+                        return (index, output_path, None)
+                inputs = urls
+                if session is not None:
+                    inputs = [await loop.run_in_executor(None, prefetch_html, session, url, pool.work_dir,
+                                                         f"page_{index}_{n}.html")
+                              for n, url in enumerate(urls, start=1)]
+                    prefetched = [os.path.join(pool.work_dir, name) for name in inputs if name not in urls]
+                await pool.convert(inputs, output_path)
+                if validators is not None:
+                    await loop.run_in_executor(None, cache.store, key, validators, output_path)
+                return (index, output_path, None)
+            except Exception as e:
+                logging.exception(f"Error processing URL(s) {', '.join(urls)}")
+                return (index, output_path, str(e))
+            finally:
+                for path in prefetched:
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
+
+    # --------------------
+    # Start Button Handler
     def start_conversion(self):
+        self.set_running(True)
+        launched = False
+        try:
+            launched = self.launch_conversion()
+        finally:
+            # Any way out that did not hand jobs to the event loop, validation
+            # errors included, ends the run here.
+            if not launched:
+                self.set_running(False)
+
+    def set_running(self, running):
+        self.start_button.config(state=tk.DISABLED if running else tk.NORMAL)
+        self.cancel_button.config(state=tk.NORMAL if running else tk.DISABLED)
+
+    # --------------------
+    # Start Conversion; returns True once jobs are running on the event loop
+    def launch_conversion(self):
         cancel_event.clear()
-        self.start_button.config(state=tk.DISABLED)
-        self.cancel_button.config(state=tk.NORMAL)
+        self.log_buffer.clear()
         self.text_box.config(state=tk.NORMAL)
         self.text_box.delete("1.0", tk.END)
         self.text_box.config(state=tk.DISABLED)
@@ -390,54 +1101,19 @@ class WebPage2PDFBundle:
         csv_file = self.csv_entry.get().strip()
         if not os.path.isfile(csv_file):
             messagebox.showerror("Error", "Please select a valid CSV file.")
-            self.start_button.config(state=tk.NORMAL)
-            self.cancel_button.config(state=tk.DISABLED)
             return
 
         # Validate wkhtmltopdf executable.
         wk_path = self.wk_entry.get().strip()
-        if not os.path.isfile(wk_path):
+        if not os.path.isfile(wk_path) or not os.access(wk_path, os.X_OK):
             messagebox.showerror("Error", "Please select a valid wkhtmltopdf executable path.")
-            self.start_button.config(state=tk.NORMAL)
-            self.cancel_button.config(state=tk.DISABLED)
-            return
-
-        try:
-            config_obj = pdfkit.configuration(wkhtmltopdf=wk_path)
-        except Exception as e:
-            messagebox.showerror("Error", f"Error configuring pdfkit: {e}")
-            self.start_button.config(state=tk.NORMAL)
-            self.cancel_button.config(state=tk.DISABLED)
             return
-
-        # Read CSV and extract URLs.
-        urls = []
         try:
-            with open(csv_file, newline="", encoding="utf-8") as f:
-                reader = csv.reader(f)
-                rows = list(reader)
-                if self.csv_header_var.get() and rows:
-                    rows = rows[1:]
-                col_index = int(self.csv_column_entry.get().strip())
-                for row in rows:
-                    if len(row) > col_index:
-                        urls.append(row[col_index].strip())
-        except Exception as e:
-            messagebox.showerror("Error", f"Error reading CSV file: {e}")
-            self.start_button.config(state=tk.NORMAL)
-            self.cancel_button.config(state=tk.DISABLED)
-            return
-
-        if not urls:
-            messagebox.showinfo("Info", "No URLs found in CSV file.")
-            self.start_button.config(state=tk.NORMAL)
-            self.cancel_button.config(state=tk.DISABLED)
+            self.log(f"Using {self.wkhtmltopdf_version(wk_path)}")
+        except (OSError, subprocess.SubprocessError) as e:
+            messagebox.showerror("Error", f"Error checking wkhtmltopdf: {e}")
             return
 
-        self.log(f"Found {len(urls)} URLs.")
-        total_urls = len(urls)
-        self.progress_bar["maximum"] = total_urls
-
         # Prepare wkhtmltopdf options.
         options = {
             "page-size": self.page_size_var.get(),
@@ -447,6 +1123,14 @@ class WebPage2PDFBundle:
             "margin-left": self.margin_left_entry.get(),
             "margin-right": self.margin_right_entry.get()
         }
+        if self.disable_js_var.get():
+            options["disable-javascript"] = None
+        if self.no_images_var.get():
+            options["no-images"] = None
+        if self.low_quality_var.get():
+            options["lowquality"] = None
+        if self.ignore_load_errors_var.get():
+            options["load-error-handling"] = "ignore"
         # Validate numeric fields (margins).
         try:
             float(options["margin-top"])
@@ -455,112 +1139,380 @@ class WebPage2PDFBundle:
             float(options["margin-right"])
         except ValueError:
             messagebox.showerror("Error", "Margins must be numeric values.")
-            self.start_button.config(state=tk.NORMAL)
-            self.cancel_button.config(state=tk.DISABLED)
+            return
+        # Built once and shared by every job.
+        wk_argv = build_wk_argv(wk_path, options)
+
+        # Get max workers from spinbox.
+        try:
+            max_workers = int(self.max_workers_spin.get())
+        except ValueError:
+            messagebox.showerror("Error", "Max Workers must be a numeric value.")
+            return
+        if max_workers < 1:
+            messagebox.showerror("Error", "Max Workers must be at least 1.")
+            return
+
+        # Get URL column index.
+        try:
+            col_index = int(self.csv_column_entry.get().strip())
+        except ValueError:
+            messagebox.showerror("Error", "URL Column Index must be a numeric value.")
             return
 
+        # Read the remaining settings once, so a run never picks up edits made
+        # while it is in progress.
+        skip_header = self.csv_header_var.get()
+        use_domain = self.naming_scheme.get() == "Website Domain"
+        fast_merge = self.fast_merge_var.get()
         mode = self.output_mode.get()
+        output_pdf = None
         if mode == "merged":
-            temp_folder = os.path.join(os.getcwd(), "temp_pdfs")
-            os.makedirs(temp_folder, exist_ok=True)
-            output_paths = {}
+            output_pdf = self.output_pdf_entry.get().strip()
         else:
             output_dir = self.output_dir_entry.get().strip()
             if not os.path.isdir(output_dir):
                 self.log("Output directory invalid. Using current directory.")
                 output_dir = os.getcwd()
-            output_paths = {}
 
-        # Get max workers from spinbox.
+        session = None
+        if self.prefetch_var.get():
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=16, pool_maxsize=max_workers)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+
+        cache = None
+        if self.use_cache_var.get():
+            try:
+                cache = PdfCache(os.path.join(os.getcwd(), "cache"))
+            except OSError as e:
+                self.log(f"Cache unavailable, rendering every page: {e}")
+
+        # wkhtmltopdf workers write into a scratch folder on the same filesystem
+        # as the output, so finished PDFs can be renamed into place.
         try:
-            max_workers = int(self.max_workers_spin.get())
-        except ValueError:
-            messagebox.showerror("Error", "Max Workers must be a numeric value.")
-            self.start_button.config(state=tk.NORMAL)
-            self.cancel_button.config(state=tk.DISABLED)
+            work_parent = os.path.dirname(os.path.abspath(output_pdf)) if mode == "merged" else output_dir
+            pool = WkWorkerPool(wk_argv, tempfile.mkdtemp(prefix="w2p_work_", dir=work_parent), max_workers)
+        except OSError as e:
+            messagebox.showerror("Error", f"Error creating temporary folder: {e}")
             return
+        self.worker_pool = pool
 
-        # Start processing URLs concurrently.
+        # Stream URLs from the CSV straight onto the event loop, so conversion
+        # starts while the rest of the file is still being read.
         futures = []
-        executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers)
-        for i, url in enumerate(urls, start=1):
-            if mode == "merged":
-                output_path = os.path.join(temp_folder, f"page_{i}.pdf")
-            else:
-                # Choose naming scheme.
-                if self.naming_scheme.get() == "Website Domain":
-                    try:
-                        parsed = urlparse(url)
-                        domain = parsed.netloc.replace("www.", "")
-                        base_name = domain if domain else "page"
-                    except Exception:
-                        base_name = "page"
-                    output_path = os.path.join(output_dir, f"{base_name}_{i}.pdf")
-                else:
-                    timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
-                    output_path = os.path.join(output_dir, f"page_{i}_{timestamp}.pdf")
+        output_paths = {}
+        temp_folder = None
+        # Descriptors of O_TMPFILE batch PDFs; closing one deletes its file.
+        temp_fds = []
+        total_urls = 0
+        invalid_count = 0
+        duplicate_count = 0
+        # Separate mode: job index -> extra output paths for repeated URLs.
+        duplicates = {}
+        # Indices of jobs that produced no PDF.
+        failed = set()
+        failed_urls = 0
+        # Merged mode: index of a one-URL retry job -> (batch index, position),
+        # so retried pages keep their place in the merged PDF.
+        retry_of = {}
+        completed = 0
+        completed_urls = 0
+        finished = False
+
+        def on_job_done(future, i, job_urls):
+            # Called on the event loop thread; progress is updated on the Tk thread.
+            self.call_soon(refresh_progress, future, i, job_urls)
+
+        def refresh_progress(future, i, job_urls):
+            nonlocal completed, completed_urls, finished, failed_urls
+            if finished:
+                return
+            completed += 1
+            result = None if future.cancelled() else future.result()
+            if result is None or result[2] is not None:
+                # Skipped after a cancel, or the conversion failed.
+                failed.add(i)
+                if result is not None and not cancel_event.is_set():
+                    # wkhtmltopdf gives up on the whole batch when one page
+                    # fails; render its URLs one at a time instead.
+                    if len(job_urls) > 1 and retry(i, job_urls, result[2]):
+                        return
+                    failed_urls += len(job_urls)
+                    for url in job_urls:
+                        self.log(f"Failed to convert {url}: {result[2]}")
+            completed_urls += len(job_urls)
+            elapsed = time.time() - self.start_time
+            self.update_eta(elapsed, completed_urls, total_urls)
+            self.progress_bar["value"] = completed_urls
+            if completed < total_jobs and not cancel_event.is_set():
+                return
+            finished = True
+            # Finish once the pool has shut down, without blocking the Tk
+            # thread while it does.
+            closing = self.event_loop.submit(pool.close(kill=cancel_event.is_set()))
+            closing.add_done_callback(lambda f: self.call_soon(finish_run))
+
+        def finish_run():
+            if session is not None:
+                session.close()
+            if cache is not None:
+                try:
+                    cache.save()
+                except OSError:
+                    logging.exception("Error saving cache index")
+            # Successful PDFs only, with retried pages in their batch's place.
+            order = sorted(output_paths, key=lambda k: retry_of.get(k, (k, 0)))
+            done_paths = {k: output_paths[k] for k in order if k not in failed}
+            self.finish_conversion(mode, done_paths, duplicates, output_pdf, fast_merge,
+                                   failed_urls, on_done=cleanup)
+
+        def cleanup():
+            # Batch PDFs are removed in one sweep once the merge is over,
+            # whether or not it succeeded.
+            for fd in temp_fds:
+                os.close(fd)
+            if temp_folder is not None:
+                shutil.rmtree(temp_folder, ignore_errors=True)
+            self.set_running(False)
+
+        def submit(i, job_urls, output_path):
             output_paths[i] = output_path
-            future = executor.submit(self.process_url, url, i, config_obj, options, output_path)
+            future = self.event_loop.submit(self.process_url(job_urls, i, pool, output_path, cache, session))
+            future.add_done_callback(lambda f: on_job_done(f, i, job_urls))
             futures.append(future)
 
-        def check_futures():
-            completed = sum(1 for f in futures if f.done())
-            elapsed = time.time() - self.start_time
-            self.update_eta(elapsed, completed, total_urls)
-            self.progress_bar["value"] = completed
-            if completed < total_urls and not cancel_event.is_set():
-                self.root.after(500, check_futures)
+        def retry(i, job_urls, error):
+            nonlocal temp_folder, total_jobs
+            if temp_folder is None:
+                # A lone batch renders straight to the output PDF; its retried
+                # pages need somewhere to go before they are merged.
+                try:
+                    temp_folder = tempfile.mkdtemp(prefix="w2p_", dir=os.path.dirname(os.path.abspath(output_pdf)))
+                except OSError as e:
+                    self.log(f"Cannot retry failed batch: {e}")
+                    return False
+            self.log(f"Batch of {len(job_urls)} URLs failed ({error}); retrying them one at a time.")
+            for n, url in enumerate(job_urls, start=1):
+                j = max(output_paths) + 1
+                retry_of[j] = (i, n)
+                total_jobs += 1
+                submit(j, [url], os.path.join(temp_folder, f"retry_{i}_{n}.pdf"))
+            return True
+
+        def abort(message):
+            nonlocal finished
+            finished = True
+            for future in futures:
+                future.cancel()
+            self.event_loop.submit(pool.close(kill=True))
+            for fd in temp_fds:
+                os.close(fd)
+            if temp_folder is not None:
+                shutil.rmtree(temp_folder, ignore_errors=True)
+            messagebox.showerror("Error", message)
+
+        # Non-http(s) entries are dropped, and each distinct URL is rendered once.
+        seen = {}
+
+        def unique_urls():
+            nonlocal invalid_count, duplicate_count
+            for i, url in enumerate(iter_urls(csv_file, col_index, skip_header), start=1):
+                if not is_web_url(url):
+                    invalid_count += 1
+                elif url in seen:
+                    duplicate_count += 1
+                    if mode == "separate":
+                        duplicates.setdefault(seen[url], []).append(separate_output_path(i, url))
+                else:
+                    seen[url] = i
+                    yield i, url
+
+        # The timestamp is taken once per run; the index alone keeps file
+        # names unique.
+        timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
+
+        def separate_output_path(i, url):
+            # Choose naming scheme.
+            if use_domain:
+                base_name = url_host(url) or "page"
+                return os.path.join(output_dir, f"{base_name}_{i}.pdf")
+            return os.path.join(output_dir, f"page_{i}_{timestamp}.pdf")
+
+        try:
+            if mode == "merged":
+                # URLs are rendered in batches so wkhtmltopdf starts once per
+                # batch instead of once per URL. A lone batch is written straight
+                # to the output PDF with nothing to merge.
+                batches = iter_batches((url for i, url in unique_urls()), BATCH_SIZE)
+                first = next(batches, None)
+                second = next(batches, None)
+                if second is None:
+                    if first is not None:
+                        submit(1, first, output_pdf)
+                        total_urls = len(first)
+                else:
+                    # Batch PDFs go next to the output file so they stay on the same filesystem.
+                    try:
+                        temp_folder = tempfile.mkdtemp(prefix="w2p_", dir=os.path.dirname(os.path.abspath(output_pdf)))
+                    except OSError as e:
+                        abort(f"Error creating temporary folder: {e}")
+                        return
+                    for i, batch in enumerate(itertools.chain([first, second], batches), start=1):
+                        anonymous = None
+                        if len(temp_fds) < MAX_ANONYMOUS_FILES:
+                            try:
+                                anonymous = open_anonymous_file(temp_folder)
+                            except OSError as e:
+                                abort(f"Error creating temporary file: {e}")
+                                return
+                        if anonymous is None:
+                            submit(i, batch, os.path.join(temp_folder, f"batch_{i}.pdf"))
+                        else:
+                            temp_fds.append(anonymous[0])
+                            submit(i, batch, anonymous[1])
+                        total_urls += len(batch)
             else:
-                executor.shutdown(wait=False)
-                self.finish_conversion(mode, output_paths)
-                self.start_button.config(state=tk.NORMAL)
-                self.cancel_button.config(state=tk.DISABLED)
+                for i, url in unique_urls():
+                    submit(i, [url], separate_output_path(i, url))
+                    total_urls += 1
+        except Exception as e:
+            abort(f"Error reading CSV file: {e}")
+            return
 
-        self.root.after(500, check_futures)
+        if not futures:
+            finished = True
+            self.event_loop.submit(pool.close())
+            messagebox.showinfo("Info", "No URLs found in CSV file.")
+            return
+
+        self.log(f"Found {total_urls} unique URLs ({duplicate_count} duplicates and "
+                 f"{invalid_count} non-http(s) entries skipped).")
+
+        # Progress is tracked per URL; a merged-mode batch advances it by its
+        # size once its PDF is written. Completions queued on the Tk thread
+        # while jobs were being submitted only run after this point, so
+        # total_jobs is always set by then.
+        total_jobs = len(futures)
+        self.progress_bar["maximum"] = total_urls
+        return True
 
     # --------------------
     # Finalizing Conversion & Merging PDFs
-    def finish_conversion(self, mode, output_paths):
-        results = []
-        for index, path in output_paths.items():
-            results.append((index, path))
-        results.sort(key=lambda x: x[0])
+    # output_paths holds the PDFs of successful jobs only, in merge order;
+    # failures counts the URLs that could not be converted.
+    def finish_conversion(self, mode, output_paths, duplicates=None, output_pdf=None,
+                          fast_merge=False, failures=0, on_done=None):
+        # on_done runs once the run is fully finished: right away, or from
+        # merge_done when a merge has been handed to the merge process.
+        merging = False
+        try:
+            merging = self.report_results(mode, output_paths, duplicates, output_pdf,
+                                          fast_merge, failures, on_done)
+        finally:
+            if not merging and on_done is not None:
+                on_done()
+
+    def report_results(self, mode, output_paths, duplicates, output_pdf, fast_merge, failures, on_done):
+        """Report the outcome of a run; return True if a merge was started in the background."""
         if mode == "merged":
-            merger = PdfMerger()
-            for idx, pdf_path in results:
-                if os.path.exists(pdf_path):
-                    merger.append(pdf_path)
-            output_pdf = self.output_pdf_entry.get().strip()
+            paths = [pdf_path for pdf_path in output_paths.values()
+                     if os.path.exists(pdf_path) and os.path.getsize(pdf_path) > 0]
+            qpdf_path = shutil.which("qpdf") if fast_merge else None
             try:
-                merger.write(output_pdf)
-                merger.close()
-                self.log(f"Merged PDF created at {output_pdf}")
-                messagebox.showinfo("Success", f"Merged PDF created at {output_pdf}")
+                if not paths:
+                    self.log("No pages could be converted; no merged PDF was created.")
+                    messagebox.showerror("Error", "No pages could be converted; see the log for details.")
+                    return False
+                if paths == [output_pdf]:
+                    # A single batch was rendered directly to the output PDF.
+                    pass
+                elif len(paths) == 1:
+                    # Only one batch succeeded; there is nothing to merge.
+                    try:
+                        os.replace(paths[0], output_pdf)
+                    except OSError:
+                        # Anonymous batch files live on /proc and cannot be renamed.
+                        shutil.copyfile(paths[0], output_pdf)
+                else:
+                    # Merging is CPU-bound; run it in its own process so the
+                    # window stays responsive.
+                    if self.merge_executor is None:
+                        # Spawn rather than fork: the event loop thread is running.
+                        self.merge_executor = concurrent.futures.ProcessPoolExecutor(
+                            max_workers=1, mp_context=multiprocessing.get_context("spawn"))
+                    try:
+                        future = self.merge_executor.submit(merge_pdfs, paths, output_pdf, qpdf_path)
+                    except concurrent.futures.process.BrokenProcessPool:
+                        self.reset_merge_executor()
+                        raise
+                    future.add_done_callback(
+                        lambda f: self.call_soon(self.merge_done, f, output_pdf, failures, on_done))
+                    self.log(f"Merging {len(paths)} PDFs...")
+                    return True
+                self.report_merged(output_pdf, failures)
             except Exception as e:
                 self.log(f"Error merging PDFs: {e}")
                 logging.exception("Merging error")
                 messagebox.showerror("Error", f"Error merging PDFs: {e}")
-            # Cleanup temporary PDFs.
-            for idx, pdf_path in results:
-                try:
-                    os.remove(pdf_path)
-                except Exception:
-                    pass
-            try:
-                os.rmdir(os.path.dirname(list(output_paths.values())[0]))
-            except Exception:
-                pass
         elif mode == "separate":
-            self.log("Individual PDFs created successfully.")
-            messagebox.showinfo("Success", "Individual PDFs have been created.")
+            # Repeated URLs were rendered once; copy that PDF to their other names.
+            for index, extra_paths in (duplicates or {}).items():
+                if index not in output_paths:
+                    continue
+                for extra_path in extra_paths:
+                    try:
+                        shutil.copyfile(output_paths[index], extra_path)
+                    except OSError:
+                        logging.exception(f"Error copying {output_paths[index]} to {extra_path}")
+            if failures:
+                self.log(f"Individual PDFs created; {failures} URL(s) could not be converted.")
+                messagebox.showwarning("Warning", f"Individual PDFs have been created, but {failures} "
+                                                  f"URL(s) could not be converted; see the log for details.")
+            else:
+                self.log("Individual PDFs created successfully.")
+                messagebox.showinfo("Success", "Individual PDFs have been created.")
+        return False
+
+    def report_merged(self, output_pdf, failures):
+        if failures:
+            self.log(f"Merged PDF created at {output_pdf}; {failures} URL(s) could not be converted.")
+            messagebox.showwarning("Warning", f"Merged PDF created at {output_pdf}, but {failures} "
+                                              f"URL(s) could not be converted; see the log for details.")
+        else:
+            self.log(f"Merged PDF created at {output_pdf}")
+            messagebox.showinfo("Success", f"Merged PDF created at {output_pdf}")
+
+    def reset_merge_executor(self):
+        # A merge process that died (e.g. killed for running out of memory)
+        # leaves the pool unusable; the next merge starts a fresh one.
+        if self.merge_executor is not None:
+            self.merge_executor.shutdown(wait=False)
+            self.merge_executor = None
+
+    def merge_done(self, future, output_pdf, failures=0, on_done=None):
+        try:
+            future.result()
+            self.report_merged(output_pdf, failures)
+        except Exception as e:
+            if isinstance(e, concurrent.futures.process.BrokenProcessPool):
+                self.reset_merge_executor()
+            self.log(f"Error merging PDFs: {e}")
+            logging.exception("Merging error")
+            messagebox.showerror("Error", f"Error merging PDFs: {e}")
+        finally:
+            if on_done is not None:
+                on_done()
 
     # --------------------
     # Cancel Button Handler
     def cancel_conversion(self):
         cancel_event.set()
+        if self.worker_pool is not None:
+            self.event_loop.submit(self.worker_pool.close(kill=True))
         self.log("Conversion cancelled by user.")
-        self.start_button.config(state=tk.NORMAL)
-        self.cancel_button.config(state=tk.DISABLED)
+        self.set_running(False)
 
 # =============================================================================
 # Main Entry Point